@@ -4,7 +4,13 @@ import xml.etree.ElementTree as et
 import re
 import gspread
 import time
-service_account = gspread.service_account(filename="./auth.json")
+import os
+import sys
+import struct
+import queue
+import signal
+import multiprocessing as mp
+from multiprocessing import shared_memory
 
 class Parser:
     @staticmethod
@@ -59,6 +65,9 @@ class ExternalDataProviderPort(ABC):
     def get_data(data):
         pass
 
+    def get_data_batch(self, data):
+        return [self.get_data(cell) for cell in data]
+
 
 class GoogleSheetDataProviderAdapter(ExternalDataProviderPort):
     def __init__(self, google_service_account, sheet_name):
@@ -69,6 +78,21 @@ class GoogleSheetDataProviderAdapter(ExternalDataProviderPort):
     def get_data(self, data):
         return self.work_sheet.acell(data).value
 
+    def get_data_batch(self, data):
+        return [value_range.first() for value_range in self.work_sheet.batch_get(data)]
+
+
+class SnapshotDataProviderAdapter(ExternalDataProviderPort):
+    """
+    Serves cell values from a per-tick snapshot taken by the farm coordinator,
+    so workers never talk to the real data provider.
+    """
+    def __init__(self, snapshot=None):
+        self.snapshot = snapshot or {}
+
+    def get_data(self, data):
+        return self.snapshot[data]
+
 
 class RangeBar(GraphicsPort):
     __value = 0
@@ -129,8 +153,246 @@ class RangeBar(GraphicsPort):
 
         return str(self.__utils)
 
-def main():
+class FrameBuffer:
+    """
+    Shared-memory slot holding the last rendered frame of one overlay.
+    Layout: 4-byte frame length followed by the UTF-8 encoded SVG.
+    """
+    __header = struct.Struct("I")
+
+    def __init__(self, size):
+        self.size = size
+        self.shm = shared_memory.SharedMemory(create=True, size=self.__header.size + size)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, frame):
+        data = frame.encode()
+        if len(data) > self.size:
+            raise Exception(f"Frame of {len(data)} bytes exceeds buffer of {self.size} bytes.")
+        start = self.__header.size
+        self.shm.buf[start:start + len(data)] = data
+        self.__header.pack_into(self.shm.buf, 0, len(data))
+
+    def read(self):
+        length, = self.__header.unpack_from(self.shm.buf, 0)
+        start = self.__header.size
+        with self.shm.buf[start:start + length] as frame:
+            return bytes(frame)
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+class Overlay:
+    """
+    A range bar fed from one cell of a data provider and written to output_path.
+    """
+    def __init__(self, svg_path, data_provider: ExternalDataProviderPort, cell, output_path):
+        self.svg_path = svg_path
+        self.data_provider = data_provider
+        self.cell = cell
+        self.output_path = output_path
+
+
+def _farm_worker(shard, tasks, done):
+    """
+    Owns the RangeBars of one shard. For every (tick, snapshot) received it
+    renders each overlay into its FrameBuffer and replies (tick, indexes),
+    or (tick, exception) on failure. Setup failures are replied with tick None.
+    """
+    # Ctrl-C is handled by the coordinator, which shuts workers down via stop().
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        bars = []
+        for index, svg_path, cell, buffer in shard:
+            provider = SnapshotDataProviderAdapter()
+            rb = RangeBar(SVGUtils(Parser.parse_svg(svg_path)), provider)
+            bars.append((index, cell, provider, rb, buffer))
+    except Exception as e:
+        done.put((None, e))
+        return
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        tick, snapshot = task
+        try:
+            for index, cell, provider, rb, buffer in bars:
+                provider.snapshot = {cell: snapshot[index]}
+                rb.execute_action("external_data_provider", cell=cell)
+                buffer.write(rb.render())
+            done.put((tick, [index for index, _, _, _, _ in bars]))
+        except Exception as e:
+            done.put((tick, e))
+    for _, _, _, _, buffer in bars:
+        buffer.close()
+
+
+class OverlayFarm:
+    """
+    Renders many overlays across a pool of worker processes.
+
+    The coordinator (this object) is the only one doing data-provider I/O:
+    each tick it batch-fetches every cell, hands each worker the snapshot of
+    its shard and writes the frames the workers publish in shared memory.
+    """
+    def __init__(self, overlays, processes=None, buffer_size=None, poll_interval=1.0, stop_timeout=5.0):
+        self.overlays = overlays
+        self.processes = max(1, min(processes or os.cpu_count() or 1, len(overlays)))
+        self.buffer_size = buffer_size
+        self.poll_interval = poll_interval
+        self.stop_timeout = stop_timeout
+        self.__buffers, self.__shards, self.__workers = [], [], []
+        self.__done = None
+        self.__tick = 0
+
+    def start(self):
+        try:
+            self.__start()
+        except BaseException:
+            self.stop()
+            raise
+
+    def __start(self):
+        ctx = mp.get_context()
+        self.__done = ctx.Queue()
+        for overlay in self.overlays:
+            # Room for the source SVG plus the growth of the rewritten attributes.
+            size = self.buffer_size or 2 * os.path.getsize(overlay.svg_path)
+            self.__buffers.append(FrameBuffer(size))
+
+        self.__shards = [list(range(n, len(self.overlays), self.processes)) for n in range(self.processes)]
+        for indexes in self.__shards:
+            shard = [
+                (i, self.overlays[i].svg_path, self.overlays[i].cell, self.__buffers[i])
+                for i in indexes
+            ]
+            tasks = ctx.Queue()
+            worker = ctx.Process(target=_farm_worker, args=(shard, tasks, self.__done), daemon=True)
+            worker.start()
+            self.__workers.append((worker, tasks))
+
+    @property
+    def buffer_names(self):
+        return tuple(buffer.name for buffer in self.__buffers)
+
+    def stop(self):
+        for worker, tasks in self.__workers:
+            if worker.is_alive():
+                tasks.put(None)
+        deadline = time.monotonic() + self.stop_timeout
+        for worker, _ in self.__workers:
+            worker.join(max(0, deadline - time.monotonic()))
+        for worker, _ in self.__workers:
+            if worker.is_alive():
+                worker.terminate()
+                worker.join(self.stop_timeout)
+            if worker.is_alive():
+                worker.kill()
+                worker.join()
+
+        if self.__done is not None:
+            # Unread replies would keep the queue's feeder thread waiting on exit.
+            while True:
+                try:
+                    self.__done.get_nowait()
+                except queue.Empty:
+                    break
+            self.__done.close()
+            self.__done.join_thread()
+            self.__done = None
+        for _, tasks in self.__workers:
+            tasks.close()
+            tasks.join_thread()
+
+        for buffer in self.__buffers:
+            buffer.close()
+            buffer.unlink()
+        self.__buffers, self.__shards, self.__workers = [], [], []
 
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def __fetch(self):
+        """
+        One batch call per data provider; returns the value of every overlay by index.
+        """
+        by_provider = {}
+        for i, overlay in enumerate(self.overlays):
+            by_provider.setdefault(id(overlay.data_provider), []).append(i)
+
+        values = {}
+        for indexes in by_provider.values():
+            provider = self.overlays[indexes[0]].data_provider
+            cells = list(dict.fromkeys(self.overlays[i].cell for i in indexes))
+            cell_values = dict(zip(cells, provider.get_data_batch(cells)))
+            for i in indexes:
+                values[i] = cell_values[self.overlays[i].cell]
+        return values
+
+    def __collect(self, tick):
+        results, pending = [], len(self.__workers)
+        while pending:
+            try:
+                reply_tick, result = self.__done.get(timeout=self.poll_interval)
+            except queue.Empty:
+                for worker, _ in self.__workers:
+                    if not worker.is_alive():
+                        raise Exception(f"Farm worker {worker.pid} exited with code {worker.exitcode}.")
+                continue
+            if reply_tick is None:
+                raise result
+            if reply_tick != tick:
+                # Left over from a tick that was aborted before all replies arrived.
+                continue
+            results.append(result)
+            pending -= 1
+        return results
+
+    def tick(self):
+        values = self.__fetch()
+        snapshots = [{i: values[i] for i in indexes} for indexes in self.__shards]
+
+        self.__tick += 1
+        for snapshot, (_, tasks) in zip(snapshots, self.__workers):
+            tasks.put((self.__tick, snapshot))
+
+        results = self.__collect(self.__tick)
+        for finished in results:
+            if isinstance(finished, Exception):
+                raise finished
+        for finished in results:
+            for i in finished:
+                with open(self.overlays[i].output_path, "wb") as f:
+                    f.write(self.__buffers[i].read())
+
+
+def main_farm(cells):
+    service_account = gspread.service_account(filename="./auth.json")
+    google_sheet_data_provider = GoogleSheetDataProviderAdapter(service_account, "Hoja1")
+
+    overlays = [
+        Overlay("rangebar.svg", google_sheet_data_provider, cell, f"./{cell}.svg")
+        for cell in cells
+    ]
+    with OverlayFarm(overlays) as farm:
+        while True:
+            farm.tick()
+            time.sleep(5)
+
+def main():
+    service_account = gspread.service_account(filename="./auth.json")
     google_sheet_data_provider = GoogleSheetDataProviderAdapter(service_account, "Hoja1")
     
     svg = Parser.parse_svg("rangebar.svg")
@@ -145,4 +407,7 @@ def main():
         time.sleep(5)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 2 and sys.argv[1] == "farm":
+        main_farm(sys.argv[2:])
+    else:
+        main()
@@ -0,0 +1,147 @@
+import os
+import re
+import tempfile
+import unittest
+from unittest import mock
+
+from main import ExternalDataProviderPort, FrameBuffer, Overlay, OverlayFarm, SnapshotDataProviderAdapter
+
+SVG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rangebar.svg")
+
+
+class FakeDataProvider(ExternalDataProviderPort):
+    def __init__(self, values, fail_times=0):
+        self.values = values
+        self.fail_times = fail_times
+        self.batch_calls = []
+
+    def get_data(self, data):
+        return self.values[data]
+
+    def get_data_batch(self, data):
+        self.batch_calls.append(list(data))
+        if self.fail_times:
+            self.fail_times -= 1
+            raise Exception("Provider unavailable.")
+        return super().get_data_batch(data)
+
+
+def fill_rect(path):
+    with open(path) as f:
+        rect = re.search(r'<rect[^>]*id="fill"[^>]*>', f.read()).group(0)
+    return re.search(r' width="([^"]*)"', rect).group(1), re.search(r' x="([^"]*)"', rect).group(1)
+
+
+def segment_exists(name):
+    return os.path.exists("/dev/shm/" + name)
+
+
+class TestFrameBuffer(unittest.TestCase):
+    def setUp(self):
+        self.buffer = FrameBuffer(16)
+
+    def tearDown(self):
+        self.buffer.close()
+        self.buffer.unlink()
+
+    def test_round_trip(self):
+        self.buffer.write("<svg>ñ</svg>")
+        self.assertEqual(self.buffer.read(), "<svg>ñ</svg>".encode())
+
+    def test_overflow(self):
+        self.buffer.write("<svg/>")
+        with self.assertRaises(Exception):
+            self.buffer.write("x" * 17)
+        self.assertEqual(self.buffer.read(), b"<svg/>")
+
+
+class TestSnapshotDataProviderAdapter(unittest.TestCase):
+    def test_get_data(self):
+        provider = SnapshotDataProviderAdapter({"A1": "30"})
+        self.assertEqual(provider.get_data("A1"), "30")
+        self.assertEqual(provider.get_data_batch(["A1"]), ["30"])
+
+
+class TestOverlayFarm(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def overlays(self, provider, cells, svg_path=SVG_PATH):
+        return [
+            Overlay(svg_path, provider, cell, os.path.join(self.tmp.name, f"{n}.svg"))
+            for n, cell in enumerate(cells)
+        ]
+
+    def test_round_trip(self):
+        provider = FakeDataProvider({"A1": "30", "A2": "50", "A3": "70"})
+        overlays = self.overlays(provider, ["A1", "A2", "A3", "A1"])
+        with OverlayFarm(overlays, processes=2) as farm:
+            farm.tick()
+            provider.values["A1"] = "40"
+            farm.tick()
+
+        self.assertEqual([fill_rect(o.output_path) for o in overlays],
+                         [("30", "-40"), ("40", "-50"), ("60", "-70"), ("30", "-40")])
+        self.assertEqual(provider.batch_calls, [["A1", "A2", "A3"]] * 2)
+
+    def test_worker_exception(self):
+        overlays = self.overlays(FakeDataProvider({"A1": "30", "A2": "not a number"}), ["A1", "A2"])
+        with OverlayFarm(overlays, processes=2) as farm:
+            with self.assertRaises(ValueError):
+                farm.tick()
+
+    def test_worker_setup_failure(self):
+        provider = FakeDataProvider({"A1": "30"})
+        overlays = self.overlays(provider, ["A1"])
+        overlays[0].svg_path = os.path.join(self.tmp.name, "missing.svg")
+        farm = OverlayFarm(overlays, buffer_size=4096, poll_interval=0.1)
+        with farm:
+            with self.assertRaises(FileNotFoundError):
+                farm.tick()
+            with self.assertRaises(Exception):
+                farm.tick()
+
+    def test_provider_failure_does_not_desync(self):
+        provider = FakeDataProvider({"A1": "30", "A2": "50"}, fail_times=1)
+        overlays = self.overlays(provider, ["A1", "A2"])
+        with OverlayFarm(overlays, processes=2) as farm:
+            with self.assertRaises(Exception):
+                farm.tick()
+            farm.tick()
+            provider.values["A2"] = "60"
+            farm.tick()
+
+        self.assertEqual([fill_rect(o.output_path) for o in overlays], [("20", "-30"), ("50", "-60")])
+
+    def test_stop_unlinks_segments(self):
+        overlays = self.overlays(FakeDataProvider({"A1": "30"}), ["A1", "A1"])
+        farm = OverlayFarm(overlays, processes=2)
+        farm.start()
+        names = farm.buffer_names
+        self.assertTrue(all(segment_exists(name) for name in names))
+        farm.tick()
+        farm.stop()
+        self.assertFalse(any(segment_exists(name) for name in names))
+
+    def test_start_failure_unlinks_segments(self):
+        overlays = self.overlays(FakeDataProvider({"A1": "30"}), ["A1", "A1"])
+        overlays[1].svg_path = os.path.join(self.tmp.name, "missing.svg")
+        farm = OverlayFarm(overlays)
+        created = []
+        original = FrameBuffer.__init__
+
+        def record(buffer, size):
+            original(buffer, size)
+            created.append(buffer.name)
+
+        with mock.patch.object(FrameBuffer, "__init__", autospec=True, side_effect=record):
+            with self.assertRaises(FileNotFoundError):
+                farm.start()
+        self.assertEqual(len(created), 1)
+        self.assertFalse(segment_exists(created[0]))
+        self.assertEqual(farm.buffer_names, ())
+
+
+if __name__ == "__main__":
+    unittest.main()